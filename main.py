@@ -15,15 +15,23 @@ No pre-trained models used.
 """
 
 from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+import asyncio
 import re
-import requests
-import json
+import functools
+import hashlib
+import math
 import os
-from typing import List, Dict, Any, Optional
+import pickle
+import string
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+import ahocorasick
 import numpy as np
-from rank_bm25 import BM25Okapi
+import orjson
 
 # ============================================================================
 # CONFIGURATION
@@ -42,6 +50,10 @@ app = FastAPI(
 _CACHE: Dict[str, Any] = {
     "messages": [],
     "doc_tokens": [],
+    "msg_lower": [],
+    "user_lower": [],
+    "user_to_docs": {},
+    "loc_to_docs": {},
     "bm25": None,
 }
 
@@ -49,118 +61,377 @@ _CACHE: Dict[str, Any] = {
 # TEXT UTILITIES
 # ============================================================================
 
+# Word-number lookup shared by the number extractors
+WORD_TO_NUM = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+    "ten": "10", "eleven": "11", "twelve": "12", "twenty": "20",
+    "thirty": "30", "hundred": "100"
+}
+
+# Precompiled patterns: compiling per call re-parses the pattern (or at
+# best hits re's bounded internal cache), so compile once at import.
+_TOKEN_RE = re.compile(r"\w+")
+_FULLNAME_RE = re.compile(r"[A-Z][a-z]+(?:\s[A-Z][a-z]+)+")
+_CAPWORD_RE = re.compile(r"\b[A-Z][a-z]+\b")
+_DIGIT_RE = re.compile(r"\b(\d+)\b")
+_WORDNUM_RE = re.compile(r"\b(" + "|".join(WORD_TO_NUM) + r")\b")
+_QTYPE_RES = [
+    ("WHO", re.compile(r"\bwho\b")),
+    ("WHEN", re.compile(r"\bwhen\b")),
+    ("WHERE", re.compile(r"\bwhere\b")),
+    ("HOW_MANY", re.compile(r"\bhow many\b")),
+    ("WHAT_ARE", re.compile(r"\bwhat are\b")),
+    ("WHICH", re.compile(r"\bwhich\b")),
+    ("WHY", re.compile(r"\bwhy\b")),
+]
+# One fused alternation: a single scan over the message instead of one
+# pass per date shape
+_DATE_RE = re.compile(
+    r"(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}"
+    r"|\b(?:today|tomorrow|tonight|next\s+\w+|this\s+\w+|last\s+\w+)\b"
+    r"|\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b"
+    r"|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b",
+    re.IGNORECASE,
+)
+_HOW_MANY_NOUN_RE = re.compile(r"how many\s+(\w+)")
+_WHERE_LOC_RE = re.compile(r"\b(?:to|in|at)\s+([A-Z][a-z]+(?:\s[A-Z][a-z]+)*)")
+
+
+# Maps every ASCII non-word character to a space so tokenization can run
+# entirely in C via str.translate + str.split
+_WORD_TRANS = str.maketrans(
+    {c: " " for c in map(chr, range(128)) if not (c.isalnum() or c == "_")}
+)
+
+
 def tokenize(text: str) -> List[str]:
     """Tokenize text into lowercase words."""
-    return re.findall(r"\w+", text.lower())
+    return _tokenize_lower(text.lower())
+
+
+def _tokenize_lower(text_lower: str) -> List[str]:
+    """Tokenize text that the caller has already lowercased."""
+    if text_lower.isascii():
+        return text_lower.translate(_WORD_TRANS).split()
+    # Non-ASCII: fall back to \w+, which understands unicode word chars
+    return _TOKEN_RE.findall(text_lower)
 
 
 # ============================================================================
 # DATA FETCHING & INDEXING
 # ============================================================================
 
-def fetch_messages() -> List[dict]:
+def _parse_timestamp(ts: Optional[str]) -> datetime:
+    """Parse an ISO timestamp, falling back to now() on bad input."""
+    try:
+        return datetime.fromisoformat(ts.replace("+00:00", ""))
+    except (AttributeError, ValueError):
+        return datetime.now()
+
+
+def _iter_raw_batches():
     """
-    Fetch all messages from local file or API.
-    
+    Yield raw item batches from the local file or the paginated API.
+
     Priority:
     1. Load from local all_messages.json if exists
     2. Fallback to fetching from API with pagination
-    
-    Returns:
-        List of messages with keys: user_name, message, timestamp
     """
     # Try local file first
     try:
         if os.path.exists("all_messages.json"):
-            with open("all_messages.json", "r") as f:
-                data = json.load(f)
-                items = data.get("items", [])
-                if items:
-                    print(f"Loaded {len(items)} messages from local file.")
-                    
-                    # Parse and sort by timestamp
-                    for it in items:
-                        try:
-                            it["_parsed_timestamp"] = datetime.fromisoformat(
-                                it["timestamp"].replace("+00:00", "")
-                            )
-                        except (KeyError, ValueError):
-                            it["_parsed_timestamp"] = datetime.now()
-                    
-                    items.sort(key=lambda x: x["_parsed_timestamp"])
-                    
-                    messages = [
-                        {
-                            "user_name": it["user_name"],
-                            "message": it["message"],
-                            "timestamp": it["_parsed_timestamp"],
-                        }
-                        for it in items
-                    ]
-                    return messages
+            with open("all_messages.json", "rb") as f:
+                items = orjson.loads(f.read()).get("items", [])
+            if items:
+                print(f"Loaded {len(items)} messages from local file.")
+                yield items
+                return
     except Exception as e:
         print(f"Could not load local file: {e}")
-    
+
     # Fallback to API
+    yield from _fetch_api_batches()
+
+
+def _fetch_api_batches() -> List[List[dict]]:
+    """
+    Fetch all pages from the API over one HTTP/2 connection.
+
+    The first page is awaited alone; when the API reports a total, the
+    remaining pages are requested concurrently — multiplexed over a
+    single connection instead of one TCP+TLS handshake per in-flight
+    request. Import is deferred: only this path needs httpx.
+    """
+    import httpx
+
     print("Fetching from API...")
-    skip = 0
     limit = 1000
-    items: List[dict] = []
 
-    while True:
+    async def fetch_page(client: httpx.AsyncClient, skip: int) -> List[dict]:
         cur_url = f"{DATA_URL}?skip={skip}&limit={limit}"
         try:
-            resp = requests.get(cur_url, timeout=15)
+            resp = await client.get(cur_url)
             if resp.status_code >= 400:
                 print(f"Stopping at skip={skip}, status={resp.status_code}")
-                break
-            data = resp.json()
-        except requests.exceptions.RequestException as e:
+                return []
+            return orjson.loads(resp.content).get("items", [])
+        except httpx.HTTPError as e:
             print(f"Request error at skip={skip}: {e}")
-            break
+            return []
         except ValueError as e:
             print(f"JSON decode error at skip={skip}: {e}")
-            break
+            return []
+
+    async def fetch_all() -> List[List[dict]]:
+        async with httpx.AsyncClient(http2=True, timeout=15) as client:
+            # First page alone: gives us the first batch and, when the API
+            # reports a total, the full set of remaining page offsets
+            first: List[dict] = []
+            total = None
+            try:
+                resp = await client.get(f"{DATA_URL}?skip=0&limit={limit}")
+                if resp.status_code < 400:
+                    data = orjson.loads(resp.content)
+                    first = data.get("items", [])
+                    total = data.get("total")
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Request error at skip=0: {e}")
+
+            if not first:
+                return []
+            batches = [first]
+
+            if isinstance(total, int) and total > limit:
+                # Known total: request the remaining pages concurrently
+                batches.extend(
+                    await asyncio.gather(
+                        *(
+                            fetch_page(client, skip)
+                            for skip in range(limit, total, limit)
+                        )
+                    )
+                )
+            elif total is None and len(first) == limit:
+                # Unknown total: walk sequentially until an empty page
+                skip = limit
+                while True:
+                    batch = await fetch_page(client, skip)
+                    if not batch:
+                        break
+                    batches.append(batch)
+                    skip += limit
+            return batches
+
+    # ensure_index runs in a worker thread, which has no event loop
+    return asyncio.run(fetch_all())
+
+
+def _parse_timestamps_ns(raw_ts: List[str]) -> np.ndarray:
+    """Parse ISO timestamp strings into a datetime64[ns] array."""
+    cleaned = [ts.replace("+00:00", "") for ts in raw_ts]
+    try:
+        # Vectorized parse: one C loop over the whole column
+        return np.array(cleaned, dtype="datetime64[ns]")
+    except ValueError:
+        # Some entry didn't parse; fall back per item
+        return np.array(
+            [np.datetime64(_parse_timestamp(ts), "ns") for ts in raw_ts],
+            dtype="datetime64[ns]",
+        )
+
 
-        batch = data.get("items", [])
-        if not batch:
-            break
+def fetch_messages() -> List[dict]:
+    """
+    Fetch all messages from local file or API.
 
-        items.extend(batch)
-        skip += limit
+    Batches stream directly into column lists; timestamps are parsed as
+    one vectorized datetime64[ns] column and the sort is a numpy argsort
+    over that array instead of a Python list.sort over datetime objects.
 
-    # Parse timestamps
-    for it in items:
-        try:
-            it["_parsed_timestamp"] = datetime.fromisoformat(it["timestamp"])
-        except (KeyError, ValueError):
-            it["_parsed_timestamp"] = datetime.now()
-    
-    items.sort(key=lambda x: x["_parsed_timestamp"])
+    Returns:
+        List of messages with keys: user_name, message, timestamp,
+        sorted by timestamp
+    """
+    raw_users: List[str] = []
+    raw_msgs: List[str] = []
+    raw_ts: List[str] = []
+    for batch in _iter_raw_batches():
+        for it in batch:
+            raw_users.append(it["user_name"])
+            raw_msgs.append(it["message"])
+            raw_ts.append(it.get("timestamp") or "")
+
+    if not raw_users:
+        print("Loaded 0 messages.")
+        return []
+
+    ts_arr = _parse_timestamps_ns(raw_ts)
+    order = np.argsort(ts_arr, kind="stable")
+    # Python datetimes only for the stored dicts; sorting stayed in numpy
+    py_ts = ts_arr[order].astype("datetime64[us]").tolist()
 
     messages = [
         {
-            "user_name": it["user_name"],
-            "message": it["message"],
-            "timestamp": it["_parsed_timestamp"],
+            "user_name": raw_users[i],
+            "message": raw_msgs[i],
+            "timestamp": py_ts[pos],
         }
-        for it in items
+        for pos, i in enumerate(order)
     ]
-
-    print(f"Loaded {len(messages)} messages from API.")
+    print(f"Loaded {len(messages)} messages.")
     return messages
 
 
+class BM25Index:
+    """
+    BM25 Okapi index stored as structure-of-arrays for fast scoring.
+
+    Instead of iterating query terms over per-document dicts in Python
+    (the rank_bm25 approach), each term's posting list is kept as a pair
+    of parallel numpy arrays (int32 doc ids, float32 term frequencies).
+    The length-normalization denominator k1*(1 - b + b*|D|/avgdl) is
+    precomputed per document, so scoring a term is a handful of
+    vectorized array ops over its postings instead of a Python loop.
+    """
+
+    def __init__(self, docs_tokens: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(docs_tokens)
+
+        # Messages are short, so document lengths fit in uint16 and term
+        # frequencies in uint8; the narrow dtypes halve the bytes the
+        # scoring scan pulls through memory
+        self.doc_len = np.array(
+            [len(toks) for toks in docs_tokens], dtype=np.uint16
+        )
+        self.avgdl = float(self.doc_len.mean()) if self.n_docs else 0.0
+
+        # Precomputed per-document denominator constants
+        if self.avgdl:
+            norm = self.doc_len.astype(np.float32) / self.avgdl
+            self.B = (self.k1 * (1.0 - self.b + self.b * norm)).astype(np.float32)
+        else:
+            self.B = np.zeros(0, dtype=np.float32)
+
+        # Build postings: term -> (doc_ids, term frequencies)
+        postings_ids: Dict[str, List[int]] = {}
+        postings_tfs: Dict[str, List[int]] = {}
+        for doc_id, toks in enumerate(docs_tokens):
+            for term, tf in Counter(toks).items():
+                postings_ids.setdefault(term, []).append(doc_id)
+                postings_tfs.setdefault(term, []).append(tf)
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (
+                np.array(postings_ids[term], dtype=np.int32),
+                np.minimum(postings_tfs[term], 255).astype(np.uint8),
+            )
+            for term in postings_ids
+        }
+
+        # Okapi IDF with the same negative-IDF flooring rank_bm25 uses
+        idf: Dict[str, float] = {}
+        negative_idfs = []
+        idf_sum = 0.0
+        for term, (ids, _) in self.postings.items():
+            df = len(ids)
+            term_idf = math.log(self.n_docs - df + 0.5) - math.log(df + 0.5)
+            idf[term] = term_idf
+            idf_sum += term_idf
+            if term_idf < 0:
+                negative_idfs.append(term)
+
+        if idf:
+            eps = 0.25 * (idf_sum / len(idf))
+            for term in negative_idfs:
+                idf[term] = eps
+
+        self.idf: Dict[str, np.float32] = {
+            term: np.float32(v) for term, v in idf.items()
+        }
+
+        # Per-term maximum contribution, used for MaxScore pruning in top_k
+        self.max_score: Dict[str, float] = {
+            term: float(self._term_scores(term)[1].max())
+            for term in self.postings
+        }
+
+    def _term_scores(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Posting doc ids and float32 BM25 contributions for one term."""
+        ids, tf = self.postings[term]
+        tf = tf.astype(np.float32)
+        return ids, self.idf[term] * tf * (self.k1 + 1.0) / (tf + self.B[ids])
+
+    def get_scores(self, q_tokens: List[str]) -> np.ndarray:
+        """
+        Score all documents against the query tokens.
+
+        Tokens are deduplicated first: BM25 weights by presence, so a
+        repeated query term must not scan its posting list twice.
+        """
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in set(q_tokens):
+            if term not in self.postings:
+                continue
+            ids, contrib = self._term_scores(term)
+            np.add.at(scores, ids, contrib)
+        return scores
+
+    def top_k(self, q_tokens: List[str], k: int) -> List[int]:
+        """
+        Return indices of the top-k scoring documents, best first.
+
+        Uses MaxScore pruning: terms are processed in decreasing order of
+        their maximum possible contribution, and scoring stops early once
+        the remaining terms cannot lift any document outside the current
+        top k past the k-th best score.
+        """
+        terms = [t for t in set(q_tokens) if t in self.postings]
+        if not terms:
+            return []
+        terms.sort(key=lambda t: self.max_score[t], reverse=True)
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        remaining = sum(self.max_score[t] for t in terms)
+
+        for term in terms:
+            remaining -= self.max_score[term]
+            ids, contrib = self._term_scores(term)
+            np.add.at(scores, ids, contrib)
+
+            if remaining <= 0.0:
+                break
+            # Early termination: the best any document outside the current
+            # top k can reach is its score plus the remaining terms' bound.
+            if self.n_docs > k:
+                part = np.partition(scores, self.n_docs - k)
+                kth_best = part[self.n_docs - k]
+                best_outside = part[self.n_docs - k - 1]
+                if kth_best >= best_outside + remaining:
+                    break
+
+        if self.n_docs <= k:
+            top = np.argsort(scores)[::-1]
+        else:
+            # O(N) partition for the top-k set, then sort only those k
+            cand = np.argpartition(scores, -k)[-k:]
+            top = cand[np.argsort(scores[cand])[::-1]]
+        top = top[scores[top] > 0.0]
+        return [int(i) for i in top]
+
+
 def build_index(messages: List[dict]):
     """
     Build BM25 index from messages.
-    
+
     BM25 is a standard ranking function used in information retrieval.
     We tokenize user_name + message together for better matching.
-    
+
     Args:
         messages: List of message dicts
-        
+
     Returns:
         Tuple of (doc_tokens, bm25_index)
     """
@@ -170,35 +441,132 @@ def build_index(messages: List[dict]):
         combined = f"{m['user_name']} {m['message']}"
         docs_tokens.append(tokenize(combined))
 
-    bm25 = BM25Okapi(docs_tokens)
+    bm25 = BM25Index(docs_tokens)
     return docs_tokens, bm25
 
 
-def ensure_index():
-    """Ensure BM25 index is built and cached."""
-    if _CACHE["bm25"] is not None:
-        return
+def _dataset_hash() -> Optional[str]:
+    """Hash of the local dataset file, used to key the persisted index."""
+    if not os.path.exists("all_messages.json"):
+        return None
+    with open("all_messages.json", "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
 
-    print("Fetching & indexing messages...")
-    messages = fetch_messages()
-    doc_tokens, bm25 = build_index(messages)
+def _index_path(h: str) -> str:
+    return f"bm25_{h}.pkl"
+
+
+def _populate_cache(messages: List[dict], doc_tokens: List[List[str]], bm25):
+    """Fill the cache with the index and the columns derived from it."""
+    msg_lower = [m["message"].lower() for m in messages]
+    user_lower = [m["user_name"].lower() for m in messages]
+
+    # Inverted entity indices: doc ids per user-name token and per known
+    # location, so entity filtering intersects precomputed arrays instead
+    # of substring-scanning every candidate
+    user_to_docs: Dict[str, List[int]] = {}
+    for i, ul in enumerate(user_lower):
+        for tok in set(tokenize(ul)):
+            user_to_docs.setdefault(tok, []).append(i)
+    loc_to_docs: Dict[str, List[int]] = {}
+    for i, ml in enumerate(msg_lower):
+        for loc in {v for _, v in _LOC_AC.iter(ml)}:
+            loc_to_docs.setdefault(loc, []).append(i)
 
     _CACHE["messages"] = messages
     _CACHE["doc_tokens"] = doc_tokens
+    _CACHE["msg_lower"] = msg_lower
+    _CACHE["user_lower"] = user_lower
+    _CACHE["user_to_docs"] = {
+        t: np.array(ids, dtype=np.int32) for t, ids in user_to_docs.items()
+    }
+    _CACHE["loc_to_docs"] = {
+        t: np.array(ids, dtype=np.int32) for t, ids in loc_to_docs.items()
+    }
     _CACHE["bm25"] = bm25
 
-    print("Index ready")
 
+def load_persisted_index(h: str) -> bool:
+    """Load a previously persisted index into the cache. Returns success."""
+    path = _index_path(h)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "rb") as f:
+            stored_hash, messages, doc_tokens, bm25 = pickle.load(f)
+    except Exception as e:
+        print(f"Could not load persisted index {path}: {e}")
+        return False
+    if stored_hash != h:
+        return False
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize index on app startup."""
+    _populate_cache(messages, doc_tokens, bm25)
+    print(f"Loaded persisted index from {path}")
+    return True
+
+
+def persist_index(h: str):
+    """Persist the cached index so later cold starts skip fetch + build."""
+    try:
+        with open(_index_path(h), "wb") as f:
+            pickle.dump(
+                (h, _CACHE["messages"], _CACHE["doc_tokens"], _CACHE["bm25"]),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+    except Exception as e:
+        print(f"Could not persist index: {e}")
+
+
+# Guards against concurrent builds when the startup task and an early
+# /ask request race to initialize the index
+_INDEX_LOCK = threading.Lock()
+
+
+def index_ready() -> bool:
+    """Whether the BM25 index is built and queries can be served."""
+    return _CACHE["bm25"] is not None
+
+
+def ensure_index():
+    """Ensure BM25 index is built and cached."""
+    if index_ready():
+        return
+
+    with _INDEX_LOCK:
+        if index_ready():
+            return
+
+        # Cold start: reuse the persisted index if it matches the dataset
+        h = _dataset_hash()
+        if h and load_persisted_index(h):
+            return
+
+        print("Fetching & indexing messages...")
+        messages = fetch_messages()
+        doc_tokens, bm25 = build_index(messages)
+        _populate_cache(messages, doc_tokens, bm25)
+
+        if h:
+            persist_index(h)
+
+        print("Index ready")
+
+
+def _build_index_in_background():
     try:
         ensure_index()
     except Exception as e:
         print(f"Failed to load index on startup: {e}")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Kick off the index build without blocking the event loop."""
+    asyncio.create_task(asyncio.to_thread(_build_index_in_background))
+
+
 # ============================================================================
 # ENTITY EXTRACTION
 # ============================================================================
@@ -226,103 +594,112 @@ def extract_person_names(q: str) -> List[str]:
     Returns:
         List of extracted person names
     """
-    # Try multi-word names first
-    full_names = re.findall(r"[A-Z][a-z]+(?:\s[A-Z][a-z]+)+", q)
-    full_names = [n for n in full_names if n.lower() not in QUESTION_WORDS]
-    if full_names:
-        return full_names
-    
-    # Fallback to single capitalized words
-    result = re.findall(r"\b[A-Z][a-z]+\b", q)
-    return [w for w in result if w.lower() not in QUESTION_WORDS]
-
-
-def extract_locations(q: str) -> List[str]:
+    toks = q.split()
+
+    # Multi-word names need two consecutive capitalized tokens; only run
+    # the full-name regex when the cheap split-based check sees that shape
+    if any(
+        a[:1].isupper() and b[:1].isupper() for a, b in zip(toks, toks[1:])
+    ):
+        full_names = _FULLNAME_RE.findall(q)
+        full_names = [n for n in full_names if n.lower() not in QUESTION_WORDS]
+        if full_names:
+            return full_names
+
+    # Single capitalized words, without a regex pass for the common case
+    names = []
+    for w in toks:
+        w = w.strip(string.punctuation)
+        if not w or w.lower() in QUESTION_WORDS:
+            continue
+        if w.isascii() and w.isalpha():
+            if w[:1].isupper() and w[1:].islower():
+                names.append(w)
+        else:
+            # Tokens with inner punctuation or non-ASCII letters (e.g.
+            # "Al-Farsi", "There's"): keep the regex's exact behavior
+            names.extend(
+                x for x in _CAPWORD_RE.findall(w)
+                if x.lower() not in QUESTION_WORDS
+            )
+    return names
+
+
+# Known locations in dataset
+LOCATION_KEYWORDS = [
+    "london", "paris", "tokyo", "new york", "dubai", "singapore",
+    "bangkok", "aspen", "maldives", "bali", "cannes", "monaco",
+    "tuscany", "santorini", "riviera", "milan", "switzerland",
+    "kyoto", "pebble beach"
+]
+
+# Aho-Corasick automaton over the known locations: finds every location
+# mention in a single linear pass instead of one substring scan per keyword.
+_LOC_AC = ahocorasick.Automaton()
+for _loc in LOCATION_KEYWORDS:
+    _LOC_AC.add_word(_loc, _loc)
+_LOC_AC.make_automaton()
+
+
+def extract_locations(q: str, q_lower: Optional[str] = None) -> List[str]:
     """
     Extract location names from query.
-    
-    Uses a list of known locations for exact matching + fallback to
-    extracted capitalized words that might be locations.
-    
+
+    Matches the query against the known-location automaton in one pass.
+
     Args:
         q: Query string
-        
+        q_lower: Optional pre-lowercased query, to skip re-lowercasing
+
     Returns:
-        List of extracted location names
+        List of extracted location names (deduplicated, in match order)
     """
-    # Known locations in dataset
-    location_keywords = [
-        "london", "paris", "tokyo", "new york", "dubai", "singapore",
-        "bangkok", "aspen", "maldives", "bali", "cannes", "monaco",
-        "tuscany", "santorini", "riviera", "milan", "switzerland",
-        "kyoto", "pebble beach"
-    ]
-    
-    found = [loc for loc in location_keywords if loc.lower() in q.lower()]
-    return found
+    if q_lower is None:
+        q_lower = q.lower()
+    return list(dict.fromkeys(v for _, v in _LOC_AC.iter(q_lower)))
+
+
+def mentions_any_location(text_lower: str, locations: List[str]) -> bool:
+    """Check whether a lowercased text mentions any of the given locations."""
+    wanted = set(locations)
+    return any(v in wanted for _, v in _LOC_AC.iter(text_lower))
 
 
 def extract_numbers(text: str) -> List[str]:
     """Extract digits and word numbers from text."""
-    digits = re.findall(r"\b(\d+)\b", text)
-    
-    word_to_num = {
-        "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
-        "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
-        "ten": "10", "eleven": "11", "twelve": "12", "twenty": "20",
-        "thirty": "30", "hundred": "100"
-    }
-    
-    words = re.findall(
-        r"\b(" + "|".join(word_to_num.keys()) + r")\b",
-        text.lower()
-    )
-    words_converted = [word_to_num[w] for w in words]
-    
+    digits = _DIGIT_RE.findall(text)
+    words_converted = [WORD_TO_NUM[w] for w in _WORDNUM_RE.findall(text.lower())]
     return digits + words_converted
 
 
-def extract_question_type(q: str) -> str:
+def extract_question_type(qlow: str) -> str:
     """
     Determine the type of question.
     
+    Expects the query already lowercased.
+
     Returns one of: WHO, WHEN, WHERE, HOW_MANY, WHAT_ARE, WHICH, WHY, GENERIC
     """
-    qlow = q.lower()
-    
-    if re.search(r"\bwho\b", qlow):
-        return "WHO"
-    elif re.search(r"\bwhen\b", qlow):
-        return "WHEN"
-    elif re.search(r"\bwhere\b", qlow):
-        return "WHERE"
-    elif re.search(r"\bhow many\b", qlow):
-        return "HOW_MANY"
-    elif re.search(r"\bwhat are\b", qlow):
-        return "WHAT_ARE"
-    elif re.search(r"\bwhich\b", qlow):
-        return "WHICH"
-    elif re.search(r"\bwhy\b", qlow):
-        return "WHY"
-    else:
-        return "GENERIC"
+    for qtype, pattern in _QTYPE_RES:
+        if pattern.search(qlow):
+            return qtype
+    return "GENERIC"
+
+
+_WORDNUM_STRICT_RE = re.compile(
+    r"\b(one|two|three|four|five|six|seven|eight|nine|ten)\b"
+)
 
 
 def extract_number_strict(text: str) -> Optional[str]:
     """Extract the first number from text."""
-    m = re.search(r"\b(\d+)\b", text)
+    m = _DIGIT_RE.search(text)
     if m:
         return m.group(1)
-    
-    word_to_num = {
-        "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
-        "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10"
-    }
-    
-    t = text.lower()
-    for w, v in word_to_num.items():
-        if re.search(rf"\b{w}\b", t):
-            return v
+
+    m = _WORDNUM_STRICT_RE.search(text.lower())
+    if m:
+        return WORD_TO_NUM[m.group(1)]
     return None
 
 
@@ -330,59 +707,75 @@ def extract_number_strict(text: str) -> Optional[str]:
 # RETRIEVAL & FILTERING
 # ============================================================================
 
-def get_context(idx: int, w: int = 2) -> List[int]:
-    """Get message indices in context window around index idx."""
-    n = len(_CACHE["messages"])
-    return list(range(max(0, idx - w), min(n, idx + w + 1)))
+def _docs_matching_any(
+    index: Dict[str, np.ndarray], entity_tokens: List[List[str]]
+) -> np.ndarray:
+    """
+    Doc ids matching any entity, where an entity matches a doc only if
+    all of its tokens do (intersection within an entity, union across).
+    """
+    per_entity = []
+    for toks in entity_tokens:
+        arrs = [index.get(t) for t in toks]
+        if not arrs or any(a is None for a in arrs):
+            continue
+        docs = arrs[0]
+        for a in arrs[1:]:
+            docs = np.intersect1d(docs, a, assume_unique=True)
+        per_entity.append(docs)
+    if not per_entity:
+        return np.empty(0, dtype=np.int32)
+    return functools.reduce(np.union1d, per_entity)
 
 
 def filter_candidates_by_entities(
-    candidates: List[int], q: str, msgs: List[dict]
+    candidates: List[int], persons: List[str], locations: List[str]
 ) -> List[int]:
     """
     Pre-filter candidates by extracted entities (person, location).
-    
+
     This is crucial for accuracy: it ensures BM25 ranking is applied
     to a relevant subset, preventing irrelevant results from being returned.
-    
+
     Strategy:
     1. Filter by person if extracted
     2. Further filter by location if available and we have many candidates
     3. Fallback to original candidates if filtering is too restrictive
-    
+
     Args:
         candidates: List of message indices
-        q: Query string
-        msgs: List of messages
-        
+        persons: Person names extracted from the query
+        locations: Locations extracted from the query
+
     Returns:
         Filtered list of candidate indices
     """
-    persons = extract_person_names(q)
-    locations = extract_locations(q)
-    
-    filtered = candidates[:]
-    
-    # Filter by person if mentioned
+    persons = [p.lower() for p in persons]
+
+    filtered = np.asarray(candidates, dtype=np.int32)
+
+    # Filter by person if mentioned: a person matches a doc when every
+    # token of their name appears in its user_name. np.isin keeps the
+    # candidates' relevance order, unlike a set intersection.
     if persons:
-        person_matches = [
-            i for i in filtered
-            if any(p.lower() in msgs[i]["user_name"].lower() for p in persons)
-        ]
-        if person_matches:
+        person_docs = _docs_matching_any(
+            _CACHE["user_to_docs"], [tokenize(p) for p in persons]
+        )
+        person_matches = filtered[np.isin(filtered, person_docs)]
+        if person_matches.size:
             filtered = person_matches
-    
+
     # Further filter by location if we have many candidates
-    if locations and len(filtered) > 5:
-        location_matches = [
-            i for i in filtered
-            if any(loc.lower() in msgs[i]["message"].lower() for loc in locations)
-        ]
-        if location_matches:
+    if locations and filtered.size > 5:
+        loc_docs = _docs_matching_any(
+            _CACHE["loc_to_docs"], [[loc] for loc in locations]
+        )
+        location_matches = filtered[np.isin(filtered, loc_docs)]
+        if location_matches.size:
             filtered = location_matches
-    
+
     # Fallback to original candidates if filtering was too restrictive
-    return filtered if filtered else candidates
+    return filtered.tolist() if filtered.size else candidates
 
 
 # ============================================================================
@@ -392,7 +785,19 @@ def filter_candidates_by_entities(
 def answer_question(q: str) -> str:
     """
     Answer a natural language question.
-    
+
+    Queries are normalized (whitespace-collapsed) and answered through an
+    LRU cache, so repeated questions skip the retrieval pipeline entirely.
+    Case is preserved because person-name extraction relies on it.
+    """
+    return _answer_cached(" ".join(q.split()))
+
+
+@functools.lru_cache(maxsize=1024)
+def _answer_cached(q: str) -> str:
+    """
+    Run the full answering pipeline for a normalized question.
+
     Pipeline:
     1. Extract entities (person, location, numbers) from query
     2. Get BM25 ranking of top 20 candidates
@@ -416,33 +821,39 @@ def answer_question(q: str) -> str:
         return NOT_FOUND_ANSWER
     
     # --------- STEP 1: BM25 ranking ---------
-    q_tokens = tokenize(q)
+    # Lowercase and extract entities once; everything below reuses these
+    qlow = q.lower()
+    q_tokens = _tokenize_lower(qlow)
     if not q_tokens:
         return NOT_FOUND_ANSWER
-    
-    scores = bm25.get_scores(q_tokens)
-    order = np.argsort(scores)[::-1]
-    top_k_indices = [int(i) for i in order[:20]]
+
+    persons = extract_person_names(q)
+    locations = extract_locations(q, q_lower=qlow)
+
+    top_k_indices = bm25.top_k(q_tokens, k=20)
     
     # --------- STEP 2: Get candidates with context ---------
+    # Deduplicate context windows through a boolean mask instead of a
+    # Python set: membership becomes an array read rather than a hash
+    # lookup. Relevance order is kept because the handlers below return
+    # the first candidate that matches.
+    mask = np.zeros(len(msgs), dtype=bool)
     cand_idx = []
-    seen = set()
     for idx in top_k_indices:
-        for j in get_context(idx, w=2):
-            if j not in seen:
-                seen.add(j)
+        for j in range(max(0, idx - 2), min(len(msgs), idx + 3)):
+            if not mask[j]:
+                mask[j] = True
                 cand_idx.append(j)
-    
+
     if not cand_idx:
         return NOT_FOUND_ANSWER
     
     # --------- STEP 3: Pre-filter by entities ---------
-    cand_idx = filter_candidates_by_entities(cand_idx, q, msgs)
-    
+    cand_idx = filter_candidates_by_entities(cand_idx, persons, locations)
+
     # --------- STEP 4: Determine question type and handle ---------
-    qtype = extract_question_type(q)
-    qlow = q.lower()
-    
+    qtype = extract_question_type(qlow)
+
     # WHO - Return person name
     if qtype == "WHO":
         if top_k_indices:
@@ -451,36 +862,23 @@ def answer_question(q: str) -> str:
     
     # WHEN - Find date/time information
     elif qtype == "WHEN":
-        date_patterns = [
-            r"(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}",
-            r"\b(today|tomorrow|tonight|next\s+\w+|this\s+\w+|last\s+\w+)\b",
-            r"\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b",
-            r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b",
-        ]
-        
         # Priority 1: Look in pre-filtered candidates
         for idx in cand_idx:
             msg = msgs[idx]["message"]
-            for pattern in date_patterns:
-                if re.search(pattern, msg, re.IGNORECASE):
-                    return msg
-        
+            if _DATE_RE.search(msg):
+                return msg
+
         # Priority 2: Search all messages of extracted person
-        persons = extract_person_names(q)
-        locations = extract_locations(q)
-        
         if persons:
+            msg_lower = _CACHE["msg_lower"]
+            user_lower = _CACHE["user_lower"]
+            persons_lower = [p.lower() for p in persons]
             for idx, msg in enumerate(msgs):
-                if any(p.lower() in msg["user_name"].lower() for p in persons):
-                    has_date = any(
-                        re.search(p, msg["message"], re.IGNORECASE)
-                        for p in date_patterns
-                    )
-                    if has_date:
+                if any(p in user_lower[idx] for p in persons_lower):
+                    if _DATE_RE.search(msg["message"]):
                         # Prefer if location also mentioned
-                        if locations and any(
-                            loc.lower() in msg["message"].lower()
-                            for loc in locations
+                        if locations and mentions_any_location(
+                            msg_lower[idx], locations
                         ):
                             return msg["message"]
                         elif not locations:
@@ -490,22 +888,21 @@ def answer_question(q: str) -> str:
     
     # WHERE - Find location information
     elif qtype == "WHERE":
-        loc_regex = r"\b(?:to|in|at)\s+([A-Z][a-z]+(?:\s[A-Z][a-z]+)*)"
         for idx in cand_idx:
-            match = re.search(loc_regex, msgs[idx]["message"])
+            match = _WHERE_LOC_RE.search(msgs[idx]["message"])
             if match:
                 return match.group(1)
         return NOT_FOUND_ANSWER
     
     # HOW_MANY - Extract and return numbers
     elif qtype == "HOW_MANY":
-        noun_match = re.search(r"how many\s+(\w+)", qlow)
+        noun_match = _HOW_MANY_NOUN_RE.search(qlow)
         noun = noun_match.group(1) if noun_match else None
-        
+
+        msg_lower = _CACHE["msg_lower"]
         for idx in cand_idx:
-            msg = msgs[idx]["message"]
-            if noun and noun in msg.lower():
-                num = extract_number_strict(msg)
+            if noun and noun in msg_lower[idx]:
+                num = extract_number_strict(msgs[idx]["message"])
                 if num:
                     return num
         
@@ -513,26 +910,27 @@ def answer_question(q: str) -> str:
     
     # WHICH - Find specific items/places
     elif qtype == "WHICH":
+        msg_lower = _CACHE["msg_lower"]
         for idx in cand_idx:
-            msg = msgs[idx]["message"]
-            if " at " in msg.lower():
-                after = msg.split(" at ", 1)[1]
+            if " at " in msg_lower[idx]:
+                after = msgs[idx]["message"].split(" at ", 1)[1]
                 return after
         return NOT_FOUND_ANSWER
-    
+
     # WHAT_ARE - Return lists/descriptions
     elif qtype == "WHAT_ARE":
+        msg_lower = _CACHE["msg_lower"]
         for idx in cand_idx:
-            msg = msgs[idx]["message"]
-            if " are " in msg.lower():
-                after = msg.split(" are ", 1)[1]
+            if " are " in msg_lower[idx]:
+                after = msgs[idx]["message"].split(" are ", 1)[1]
                 return after
         return NOT_FOUND_ANSWER
-    
+
     # WHY - Find cause/reason
     elif qtype == "WHY":
+        msg_lower = _CACHE["msg_lower"]
         for idx in cand_idx:
-            if "because" in msgs[idx]["message"].lower():
+            if "because" in msg_lower[idx]:
                 return msgs[idx]["message"]
         return NOT_FOUND_ANSWER
     
@@ -560,6 +958,11 @@ def ask(q: str = Query(..., description="Natural language question")):
     Returns:
         {"answer": "..."}
     """
+    if not index_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Index is still building, try again shortly."},
+        )
     try:
         ans = answer_question(q)
         return {"answer": ans}
@@ -572,7 +975,12 @@ def refresh():
     """Clear cache and rebuild index."""
     _CACHE["messages"] = []
     _CACHE["doc_tokens"] = []
+    _CACHE["msg_lower"] = []
+    _CACHE["user_lower"] = []
+    _CACHE["user_to_docs"] = {}
+    _CACHE["loc_to_docs"] = {}
     _CACHE["bm25"] = None
+    _answer_cached.cache_clear()
     ensure_index()
     return {"status": "refreshed"}
 